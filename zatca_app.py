@@ -3,19 +3,154 @@ Unified ZATCA E-Invoice Application
 Combines functionality from app.py and zatca.py
 """
 
+from concurrent.futures import ProcessPoolExecutor
+import copy
 from datetime import datetime
-import uuid
+from functools import lru_cache
+import json
+import logging
 import os
+from pathlib import Path
+import secrets
 import hashlib
-import base64
-import qrcode
+from binascii import b2a_base64
+import numpy as np
+import segno
 
-from Crypto.PublicKey import ECC
-from Crypto.Signature import DSS
-from Crypto.Hash import SHA256
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
 from lxml import etree
 
+log = logging.getLogger(__name__)
+
+# SHA-256 goes through hashlib's OpenSSL binding when available; OpenSSL's EVP
+# layer auto-dispatches to the Intel SHA extensions (SHA-NI) on CPUs that have
+# them and falls back to its scalar C implementation otherwise.
+try:
+    from _hashlib import openssl_sha256 as _sha256
+    _SHA256_BACKEND = "openssl"
+except ImportError:
+    _sha256 = hashlib.sha256
+    _SHA256_BACKEND = "builtin"
+log.debug("SHA-256 backend: %s", _SHA256_BACKEND)
+
+
+def _digest(data):
+    """Return the raw SHA-256 digest of data using the active backend"""
+    return _sha256(data).digest()
+
+
+def _b64(data):
+    """Base64-encode bytes to str in a single C call
+
+    binascii.b2a_base64 produces the encoded bytes directly, without the
+    extra buffer handling base64.b64encode layers on top of it.
+    """
+    return b2a_base64(data, newline=False).decode('ascii')
+
+
+@lru_cache(maxsize=4096)
+def _fmt(amount):
+    """Format a float as the 2-decimal string ZATCA amounts use
+
+    Invoices repeat the same few values (line totals, document totals,
+    zero allowances) many times, so memoizing avoids re-formatting them.
+    """
+    return f"{amount:.2f}"
+
+
+_ZERO = "0.00"
+
+# Signature scaffold placeholders; constant, so encoded exactly once
+_PLACEHOLDER_DIGEST = _b64(_digest(b"invoice_digest"))
+_PLACEHOLDER_SIGNATURE = _b64(b"signature_placeholder")
+_PLACEHOLDER_CERTIFICATE = _b64(b"certificate_placeholder")
+
+# Timestamp formats used when defaulting invoice number, date and time
+_DATE_FMT = '%Y-%m-%d'
+_TIME_FMT = '%H:%M:%S'
+_COMPACT_DATE_FMT = '%Y%m%d'
+
+
+def _uuid4_str():
+    """Random version-4 UUID string
+
+    Does the version/variant bit twiddling inline; skips the uuid.UUID
+    object allocation and __str__ formatting that uuid.uuid4() pays on
+    every call.
+    """
+    raw = bytearray(secrets.token_bytes(16))
+    raw[6] = (raw[6] & 0x0F) | 0x40
+    raw[8] = (raw[8] & 0x3F) | 0x80
+    h = raw.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+def _compute_totals(prices, quantities, tax_rate):
+    """Compute per-line totals/VAT and their sums from float64 arrays"""
+    line_totals = prices * quantities
+    line_vat = line_totals * (tax_rate / 100.0)
+    return line_totals, line_vat, line_totals.sum(), line_vat.sum()
+
+
+# JIT-compile the numeric kernel when Numba is available; the cached
+# compilation persists across runs, and the NumPy version above is the
+# fallback so the dependency stays optional
+try:
+    from numba import njit
+    _compute_totals = njit(cache=True)(_compute_totals)
+except ImportError:
+    pass
+
+
+def _qr_tlv(fields):
+    """Encode (tag, str) pairs as the TLV bytes ZATCA QR codes carry
+
+    A single bytearray accumulator keeps this to one allocation that
+    grows in place, instead of building intermediate bytes objects per
+    field and concatenating them.
+    """
+    buf = bytearray()
+    for tag, value in fields:
+        encoded = value.encode('utf-8')
+        buf.append(tag)
+        buf.append(len(encoded))
+        buf += encoded
+    return bytes(buf)
+
+
+def _canonical_bytes(invoice_data):
+    """Serialize invoice data deterministically for hashing and signing
+
+    Dict repr is non-canonical (float repr, nested ordering), so the same
+    invoice could hash differently across runs. Canonical JSON with sorted
+    keys gives a stable byte stream that verifiers can reproduce.
+    Underscore-prefixed keys are derived caches, not invoice content, and
+    are excluded from the signed payload.
+    """
+    payload = {}
+    for key, value in invoice_data.items():
+        if key.startswith('_'):
+            continue
+        if key == 'items':
+            value = [{k: v for k, v in item.items() if not k.startswith('_')}
+                     for item in value]
+        payload[key] = value
+    return json.dumps(payload, sort_keys=True, separators=(',', ':'),
+                      default=str).encode('utf-8')
+
+
 class ZatcaInvoice:
+    # Shared invoice skeleton, built by the first instance; the structure
+    # is identical for every instance, so workers and short-lived objects
+    # don't each pay the template construction cost
+    _shared_template = None
+
+    # Clark-notation tag names interned at class level: the namespace map
+    # never varies between instances, so every instance in the process
+    # shares one cache and each name is formatted exactly once
+    _tags = {}
+
     def __init__(self):
         self.NSMAP = {
             None: "urn:oasis:names:specification:ubl:schema:xsd:Invoice-2",
@@ -29,29 +164,80 @@ class ZatcaInvoice:
             "sbc": "urn:oasis:names:specification:ubl:schema:xsd:SignatureBasicComponents-2"
         }
         self.invoice_counter = 1
+        # Canonical hash of the most recently built invoice, for PIH chaining
+        self.last_invoice_hash = None
+        # Key paths already confirmed on disk, so repeat invoices skip the
+        # per-call existence probe
+        self._ready_keys = set()
+        # Prebuilt seller subtrees keyed by party payload; a fixed seller
+        # means one build amortized over every invoice. Buyers churn per
+        # invoice, so only the most recent one is kept.
+        self._party_cache = {}
+        self._last_buyer = (None, None)
+        # Parsed private keys, keyed by (path, mtime_ns) so a rewritten
+        # key file is picked up automatically. Not thread-safe; give each
+        # thread its own ZatcaInvoice if signing concurrently.
+        self._key_cache = {}
+        # Compiled XPath expressions for the template nodes filled per
+        # invoice; etree.XPath compiles once and evaluates in C, while
+        # find() re-parses its path on every call
+        ns = {prefix: uri for prefix, uri in self.NSMAP.items() if prefix}
+        self._find_signature_value = etree.XPath('.//ds:SignatureValue', namespaces=ns)
+        self._find_invoice_id = etree.XPath('cbc:ID', namespaces=ns)
+        self._find_uuid = etree.XPath('cbc:UUID', namespaces=ns)
+        self._find_issue_date = etree.XPath('cbc:IssueDate', namespaces=ns)
+        self._find_issue_time = etree.XPath('cbc:IssueTime', namespaces=ns)
+        self._find_icv_value = etree.XPath(
+            "cac:AdditionalDocumentReference[cbc:ID='ICV']/cbc:UUID", namespaces=ns)
+        self._find_digest_value = etree.XPath('.//ds:DigestValue', namespaces=ns)
+        self._find_excluded_from_digest = etree.XPath(
+            "ext:UBLExtensions | cac:AdditionalDocumentReference[cbc:ID='QR']",
+            namespaces=ns)
+        # Static invoice skeleton; create_invoice_xml deep-copies it per
+        # invoice instead of rebuilding the invariant elements every time
+        if ZatcaInvoice._shared_template is None:
+            ZatcaInvoice._shared_template = self._build_template()
+        self._template = ZatcaInvoice._shared_template
 
     def generate_keys(self, private_key_path="zatca_private.pem", public_key_path="zatca_public.pem"):
-        """Generate ECDSA P-256 key pair for ZATCA e-invoices"""
+        """Generate ECDSA secp256k1 key pair for ZATCA e-invoices
+
+        ZATCA Phase 2 mandates ECDSA on secp256k1 for invoice signing.
+        """
         try:
-            private_key = ECC.generate(curve='P-256')
-            public_key = private_key.public_key()
-            
-            with open(private_key_path, "wt") as f:
-                f.write(private_key.export_key(format='PEM'))
-            with open(public_key_path, "wt") as f:
-                f.write(public_key.export_key(format='PEM'))
-            
-            print(f"Generated new key pair:\n  Private: {private_key_path}\n  Public: {public_key_path}")
+            # The cryptography package binds OpenSSL, which carries tuned
+            # EC assembly; key material stays interoperable (PKCS8 PEM)
+            private_key = ec.generate_private_key(ec.SECP256K1())
+            private_pem = private_key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption())
+            public_pem = private_key.public_key().public_bytes(
+                serialization.Encoding.PEM,
+                serialization.PublicFormat.SubjectPublicKeyInfo)
+
+            Path(private_key_path).write_bytes(private_pem)
+            Path(public_key_path).write_bytes(public_pem)
+
+            log.info("Generated new key pair: private=%s public=%s",
+                     private_key_path, public_key_path)
             return private_key_path, public_key_path
         except Exception as e:
-            print(f"Error generating keys: {str(e)}")
+            log.error("Error generating keys: %s", e)
             return None, None
 
+    def _tag(self, prefix, localname):
+        """Return the cached Clark-notation name for prefix:localname"""
+        try:
+            return self._tags[prefix, localname]
+        except KeyError:
+            tag = f"{{{self.NSMAP[prefix]}}}{localname}"
+            self._tags[prefix, localname] = tag
+            return tag
+
     def _format_amount(self, amount):
         """Format numeric amounts to 2 decimal places as string"""
-        if isinstance(amount, float):
-            return "{:.2f}".format(amount)
-        return "{:.2f}".format(float(amount))
+        return _fmt(float(amount))
 
     def create_simple_invoice(self, seller_data, buyer_data, invoice_items, 
                              invoice_number=None, previous_invoice_hash=None, 
@@ -71,24 +257,41 @@ class ZatcaInvoice:
         Returns:
             dict: Complete invoice data structure
         """
-        if invoice_number is None:
-            invoice_number = f"INV-{datetime.now().strftime('%Y%m%d')}-{self.invoice_counter:03d}"
-            self.invoice_counter += 1
-            
-        if issue_date is None:
-            issue_date = datetime.now().strftime('%Y-%m-%d')
-            
-        if issue_time is None:
-            issue_time = datetime.now().strftime('%H:%M:%S')
-        
-        # Calculate totals from items
-        total_without_vat = sum(item['price'] * item['quantity'] for item in invoice_items)
-        vat_amount = total_without_vat * (tax_rate / 100)
+        # Capture the clock once instead of once per defaulted field
+        if invoice_number is None or issue_date is None or issue_time is None:
+            now = datetime.now()
+
+            if invoice_number is None:
+                invoice_number = f"INV-{now.strftime(_COMPACT_DATE_FMT)}-{self.invoice_counter:03d}"
+                self.invoice_counter += 1
+
+            if issue_date is None:
+                issue_date = now.strftime(_DATE_FMT)
+
+            if issue_time is None:
+                issue_time = now.strftime(_TIME_FMT)
+        
+        # Normalize numeric fields once; items often arrive from JSON with
+        # str or Decimal values and each line references them several times
+        for item in invoice_items:
+            item['_price_f'] = float(item['price'])
+            item['_qty_f'] = float(item['quantity'])
+
+        # Calculate totals from items in one pass of vectorized arithmetic
+        count = len(invoice_items)
+        prices = np.fromiter((item['_price_f'] for item in invoice_items),
+                             dtype=np.float64, count=count)
+        quantities = np.fromiter((item['_qty_f'] for item in invoice_items),
+                                 dtype=np.float64, count=count)
+        line_totals, line_vat, subtotal, vat_total = _compute_totals(
+            prices, quantities, float(tax_rate))
+        total_without_vat = float(subtotal)
+        vat_amount = float(vat_total)
         total_with_vat = total_without_vat + vat_amount
 
         invoice_data = {
             'invoice_number': invoice_number,
-            'uuid': str(uuid.uuid4()),
+            'uuid': _uuid4_str(),
             'seller': seller_data,
             'buyer': buyer_data,
             'issue_date': issue_date,
@@ -98,383 +301,481 @@ class ZatcaInvoice:
             'total_with_vat': total_with_vat,
             'vat_amount': vat_amount,
             'items': invoice_items,
-            'previous_invoice_hash': previous_invoice_hash
+            'previous_invoice_hash': previous_invoice_hash,
+            # Precomputed per-line amounts, reused when emitting line items
+            '_line_totals': line_totals,
+            '_line_vat': line_vat
         }
         
         return invoice_data
 
     def generate_qr_code(self, invoice_data, output_path=None):
-        """Generate QR code for the invoice"""
-        seller_vat = invoice_data['seller']['vat']
-        timestamp = f"{invoice_data['issue_date']}T{invoice_data['issue_time']}"
-        total = self._format_amount(invoice_data['total_with_vat'])
-        vat = self._format_amount(invoice_data['vat_amount'])
-        
-        # Generate hash of invoice data for the QR code
-        hash_content = f"{seller_vat}{timestamp}{total}{vat}".encode('utf-8')
-        hash_value = base64.b64encode(hashlib.sha256(hash_content).digest()).decode('utf-8')
-        
-        # Combine elements according to ZATCA requirements
-        qr_data = f"{seller_vat}|{timestamp}|{total}|{vat}|{hash_value}"
-        
-        # Generate QR code image if output path is provided
+        """Generate the base64 TLV QR payload for the invoice
+
+        Fields follow the ZATCA tag assignments: 1 seller name, 2 VAT
+        number, 3 timestamp, 4 invoice total, 5 VAT amount.
+        """
+        # The payload is encoded at most once per invoice; repeat calls
+        # reuse the cached value
+        qr_data = invoice_data.get('_qr_cache')
+        if qr_data is None:
+            tlv = _qr_tlv((
+                (1, invoice_data['seller']['name']),
+                (2, invoice_data['seller']['vat']),
+                (3, f"{invoice_data['issue_date']}T{invoice_data['issue_time']}"),
+                (4, self._format_amount(invoice_data['total_with_vat'])),
+                (5, self._format_amount(invoice_data['vat_amount'])),
+            ))
+            qr_data = _b64(tlv)
+            invoice_data['_qr_cache'] = qr_data
+        
+        # Generate QR code image if output path is provided; segno writes
+        # PNG directly from the bit matrix without going through PIL
         if output_path:
-            qr = qrcode.QRCode(version=1, box_size=10, border=5)
-            qr.add_data(qr_data)
-            qr.make(fit=True)
-            img = qr.make_image(fill_color="black", back_color="white")
-            img.save(output_path)
+            segno.make(qr_data, error='m').save(output_path, scale=10, border=5)
         
         return qr_data
 
     def sign_invoice(self, invoice_data, private_key_path="zatca_private.pem"):
-        """Sign the invoice with ECDSA P-256"""
+        """Sign the invoice with ECDSA (SHA-256)"""
         try:
-            with open(private_key_path, "rt") as f:
-                private_key = ECC.import_key(f.read())
-            
-            # Serialize invoice data
-            invoice_str = str(invoice_data).encode('utf-8')
-            
-            # Hash the data
-            hash_obj = SHA256.new(invoice_str)
-            
-            # Sign the hash
-            signer = DSS.new(private_key, 'fips-186-3')
-            signature = signer.sign(hash_obj)
-            
+            # Reuse the parsed key across invoices; PEM/ASN.1 parsing
+            # costs far more than the ECDSA signature itself
+            cache_key = (private_key_path, os.stat(private_key_path).st_mtime_ns)
+            private_key = self._key_cache.get(cache_key)
+            if private_key is None:
+                with open(private_key_path, "rb") as f:
+                    private_key = serialization.load_pem_private_key(
+                        f.read(), password=None)
+                self._key_cache[cache_key] = private_key
+
+            # Serialize invoice data canonically so verification is stable
+            invoice_bytes = _canonical_bytes(invoice_data)
+
+            # Hash and sign through OpenSSL's EVP interface
+            signature = private_key.sign(invoice_bytes, ec.ECDSA(hashes.SHA256()))
+
             # Return base64 encoded signature
-            return base64.b64encode(signature).decode('utf-8')
+            return _b64(signature)
         except Exception as e:
-            print(f"Error signing invoice: {str(e)}")
+            log.error("Error signing invoice: %s", e)
             # Return a valid base64 placeholder for testing
-            return base64.b64encode(b"signature_placeholder").decode('utf-8')
+            return _PLACEHOLDER_SIGNATURE
+
+    def _build_template(self):
+        """Build the static invoice skeleton shared by all invoices
+
+        Everything that is invariant between invoices — the signature
+        scaffold, UBL identifiers, invoice type, currency codes and the
+        ICV reference — is built exactly once here. create_invoice_xml
+        deep-copies the skeleton and fills only the dynamic text nodes.
+        """
+        root = etree.Element("Invoice", nsmap=self.NSMAP)
+
+        # Signature scaffold (must be the first child)
+        self._add_signature_placeholder(root)
 
-    def _add_common_elements(self, invoice_root, invoice_data):
-        """Add common elements to the invoice in the correct order"""
         # UBL Version ID
-        etree.SubElement(invoice_root, f"{{{self.NSMAP['cbc']}}}UBLVersionID").text = "2.1"
-        
+        etree.SubElement(root, self._tag('cbc', 'UBLVersionID')).text = "2.1"
+
         # Customization ID
-        etree.SubElement(invoice_root, f"{{{self.NSMAP['cbc']}}}CustomizationID").text = "urn:cen.eu:en16931:2017#compliant#urn:fdc:peppol.eu:2017:poacc:billing:3.0"
-        
+        etree.SubElement(root, self._tag('cbc', 'CustomizationID')).text = "urn:cen.eu:en16931:2017#compliant#urn:fdc:peppol.eu:2017:poacc:billing:3.0"
+
         # Profile ID
-        etree.SubElement(invoice_root, f"{{{self.NSMAP['cbc']}}}ProfileID").text = "reporting:1.0"
-        
-        # Invoice number
-        etree.SubElement(invoice_root, f"{{{self.NSMAP['cbc']}}}ID").text = invoice_data['invoice_number']
-        
-        # UUID
-        etree.SubElement(invoice_root, f"{{{self.NSMAP['cbc']}}}UUID").text = invoice_data['uuid']
-        
-        # Issue date
-        etree.SubElement(invoice_root, f"{{{self.NSMAP['cbc']}}}IssueDate").text = invoice_data['issue_date']
-        
-        # Issue time
-        etree.SubElement(invoice_root, f"{{{self.NSMAP['cbc']}}}IssueTime").text = invoice_data['issue_time']
-        
+        etree.SubElement(root, self._tag('cbc', 'ProfileID')).text = "reporting:1.0"
+
+        # Invoice number, UUID, issue date and time (filled per invoice)
+        etree.SubElement(root, self._tag('cbc', 'ID'))
+        etree.SubElement(root, self._tag('cbc', 'UUID'))
+        etree.SubElement(root, self._tag('cbc', 'IssueDate'))
+        etree.SubElement(root, self._tag('cbc', 'IssueTime'))
+
         # Invoice type code
-        invoice_type = etree.SubElement(invoice_root, f"{{{self.NSMAP['cbc']}}}InvoiceTypeCode")
+        invoice_type = etree.SubElement(root, self._tag('cbc', 'InvoiceTypeCode'))
         invoice_type.text = "388"  # Standard tax invoice
         invoice_type.set("name", "0100000")  # NNPNESB format
-        
+
         # Document currency
-        etree.SubElement(invoice_root, f"{{{self.NSMAP['cbc']}}}DocumentCurrencyCode").text = "SAR"
-        
+        etree.SubElement(root, self._tag('cbc', 'DocumentCurrencyCode')).text = "SAR"
+
         # Tax currency
-        etree.SubElement(invoice_root, f"{{{self.NSMAP['cbc']}}}TaxCurrencyCode").text = "SAR"
-        
-        # Add invoice counter
-        additional_doc_ref = etree.SubElement(invoice_root, f"{{{self.NSMAP['cac']}}}AdditionalDocumentReference")
-        etree.SubElement(additional_doc_ref, f"{{{self.NSMAP['cbc']}}}ID").text = "ICV"
-        etree.SubElement(additional_doc_ref, f"{{{self.NSMAP['cbc']}}}UUID").text = str(self.invoice_counter)
-        
+        etree.SubElement(root, self._tag('cbc', 'TaxCurrencyCode')).text = "SAR"
+
+        # Invoice counter (value filled per invoice)
+        additional_doc_ref = etree.SubElement(root, self._tag('cac', 'AdditionalDocumentReference'))
+        etree.SubElement(additional_doc_ref, self._tag('cbc', 'ID')).text = "ICV"
+        etree.SubElement(additional_doc_ref, self._tag('cbc', 'UUID'))
+
+        return root
+
+    def _fill_common_elements(self, invoice_root, invoice_data):
+        """Fill the dynamic header fields of a template copy"""
+        self._find_invoice_id(invoice_root)[0].text = invoice_data['invoice_number']
+        self._find_uuid(invoice_root)[0].text = invoice_data['uuid']
+        self._find_issue_date(invoice_root)[0].text = invoice_data['issue_date']
+        self._find_issue_time(invoice_root)[0].text = invoice_data['issue_time']
+
+        # Invoice counter value (ICV); an explicit value wins over the
+        # instance counter so bulk mode can assign ICVs in the parent
+        self._find_icv_value(invoice_root)[0].text = str(
+            invoice_data.get('icv') or self.invoice_counter)
+
         # Add previous invoice hash if available (BR-KSA-61)
         if invoice_data.get('previous_invoice_hash'):
-            prev_hash_ref = etree.SubElement(invoice_root, f"{{{self.NSMAP['cac']}}}AdditionalDocumentReference")
-            etree.SubElement(prev_hash_ref, f"{{{self.NSMAP['cbc']}}}ID").text = "PIH"
-            attachment = etree.SubElement(prev_hash_ref, f"{{{self.NSMAP['cac']}}}Attachment")
-            embedded_doc = etree.SubElement(attachment, f"{{{self.NSMAP['cbc']}}}EmbeddedDocumentBinaryObject")
+            prev_hash_ref = etree.SubElement(invoice_root, self._tag('cac', 'AdditionalDocumentReference'))
+            etree.SubElement(prev_hash_ref, self._tag('cbc', 'ID')).text = "PIH"
+            attachment = etree.SubElement(prev_hash_ref, self._tag('cac', 'Attachment'))
+            embedded_doc = etree.SubElement(attachment, self._tag('cbc', 'EmbeddedDocumentBinaryObject'))
             embedded_doc.set("mimeCode", "text/plain")
             embedded_doc.text = invoice_data['previous_invoice_hash']
     
     def _add_seller_info(self, invoice_root, invoice_data):
         """Add seller information section"""
-        accounting_supplier_party = etree.SubElement(invoice_root, f"{{{self.NSMAP['cac']}}}AccountingSupplierParty")
-        party = etree.SubElement(accounting_supplier_party, f"{{{self.NSMAP['cac']}}}Party")
-        
+        invoice_root.append(self._party_element('seller', invoice_data['seller']))
+
+    def _add_customer_info(self, invoice_root, invoice_data):
+        """Add customer information section"""
+        invoice_root.append(self._party_element('buyer', invoice_data['buyer']))
+
+    def _party_element(self, kind, party_data):
+        """Return the party subtree for this data, building it at most once
+
+        A merchant issues every invoice with the same seller block, so
+        seller subtrees are cached per distinct payload (a handful per
+        tenant at most) and deep-copied per invoice. Buyers are usually
+        unique per invoice in long-running workloads, so caching them all
+        would grow without bound; only the most recent buyer subtree is
+        kept, which still covers runs of invoices to the same customer.
+        """
+        key = json.dumps(party_data, sort_keys=True, default=str)
+        if kind == 'seller':
+            cached = self._party_cache.get(key)
+            if cached is None:
+                cached = self._build_seller_party(party_data)
+                self._party_cache[key] = cached
+        else:
+            last_key, cached = self._last_buyer
+            if key != last_key:
+                cached = self._build_buyer_party(party_data)
+                self._last_buyer = (key, cached)
+        return copy.deepcopy(cached)
+
+    def _build_seller_party(self, seller):
+        """Build a standalone AccountingSupplierParty subtree"""
+        accounting_supplier_party = etree.Element(self._tag('cac', 'AccountingSupplierParty'))
+        party = etree.SubElement(accounting_supplier_party, self._tag('cac', 'Party'))
+
         # Add party identification with dynamic scheme
-        party_id = etree.SubElement(party, f"{{{self.NSMAP['cac']}}}PartyIdentification")
-        id_elem = etree.SubElement(party_id, f"{{{self.NSMAP['cbc']}}}ID")
-        id_elem.text = invoice_data['seller']['id_number']
-        id_elem.set("schemeID", invoice_data['seller']['id_scheme'])
-        
+        party_id = etree.SubElement(party, self._tag('cac', 'PartyIdentification'))
+        id_elem = etree.SubElement(party_id, self._tag('cbc', 'ID'))
+        id_elem.text = seller['id_number']
+        id_elem.set("schemeID", seller['id_scheme'])
+
         # Add postal address with all required fields for BR-KSA-09
-        postal_address = etree.SubElement(party, f"{{{self.NSMAP['cac']}}}PostalAddress")
-        etree.SubElement(postal_address, f"{{{self.NSMAP['cbc']}}}StreetName").text = invoice_data['seller']['address']['street']
-        etree.SubElement(postal_address, f"{{{self.NSMAP['cbc']}}}BuildingNumber").text = invoice_data['seller']['address']['building']
-        etree.SubElement(postal_address, f"{{{self.NSMAP['cbc']}}}CityName").text = invoice_data['seller']['address']['city']
-        etree.SubElement(postal_address, f"{{{self.NSMAP['cbc']}}}PostalZone").text = invoice_data['seller']['address']['postal_code']
-        etree.SubElement(postal_address, f"{{{self.NSMAP['cbc']}}}CountrySubentity").text = invoice_data['seller']['address']['district']
-        country = etree.SubElement(postal_address, f"{{{self.NSMAP['cac']}}}Country")
-        etree.SubElement(country, f"{{{self.NSMAP['cbc']}}}IdentificationCode").text = invoice_data['seller']['address']['country_code']
-        
+        postal_address = etree.SubElement(party, self._tag('cac', 'PostalAddress'))
+        etree.SubElement(postal_address, self._tag('cbc', 'StreetName')).text = seller['address']['street']
+        etree.SubElement(postal_address, self._tag('cbc', 'BuildingNumber')).text = seller['address']['building']
+        etree.SubElement(postal_address, self._tag('cbc', 'CityName')).text = seller['address']['city']
+        etree.SubElement(postal_address, self._tag('cbc', 'PostalZone')).text = seller['address']['postal_code']
+        etree.SubElement(postal_address, self._tag('cbc', 'CountrySubentity')).text = seller['address']['district']
+        country = etree.SubElement(postal_address, self._tag('cac', 'Country'))
+        etree.SubElement(country, self._tag('cbc', 'IdentificationCode')).text = seller['address']['country_code']
+
         # Add seller VAT
-        party_tax_scheme = etree.SubElement(party, f"{{{self.NSMAP['cac']}}}PartyTaxScheme")
-        etree.SubElement(party_tax_scheme, f"{{{self.NSMAP['cbc']}}}CompanyID").text = invoice_data['seller']['vat']
-        tax_scheme = etree.SubElement(party_tax_scheme, f"{{{self.NSMAP['cac']}}}TaxScheme")
-        etree.SubElement(tax_scheme, f"{{{self.NSMAP['cbc']}}}ID").text = "VAT"
-        
+        party_tax_scheme = etree.SubElement(party, self._tag('cac', 'PartyTaxScheme'))
+        etree.SubElement(party_tax_scheme, self._tag('cbc', 'CompanyID')).text = seller['vat']
+        tax_scheme = etree.SubElement(party_tax_scheme, self._tag('cac', 'TaxScheme'))
+        etree.SubElement(tax_scheme, self._tag('cbc', 'ID')).text = "VAT"
+
         # Add seller name
-        party_legal_entity = etree.SubElement(party, f"{{{self.NSMAP['cac']}}}PartyLegalEntity")
-        etree.SubElement(party_legal_entity, f"{{{self.NSMAP['cbc']}}}RegistrationName").text = invoice_data['seller']['name']
+        party_legal_entity = etree.SubElement(party, self._tag('cac', 'PartyLegalEntity'))
+        etree.SubElement(party_legal_entity, self._tag('cbc', 'RegistrationName')).text = seller['name']
+        return accounting_supplier_party
+
+    def _build_buyer_party(self, buyer):
+        """Build a standalone AccountingCustomerParty subtree"""
+        accounting_customer_party = etree.Element(self._tag('cac', 'AccountingCustomerParty'))
+        party = etree.SubElement(accounting_customer_party, self._tag('cac', 'Party'))
 
-    def _add_customer_info(self, invoice_root, invoice_data):
-        """Add customer information section"""
-        accounting_customer_party = etree.SubElement(invoice_root, f"{{{self.NSMAP['cac']}}}AccountingCustomerParty")
-        party = etree.SubElement(accounting_customer_party, f"{{{self.NSMAP['cac']}}}Party")
-        
         # Add party identification with dynamic scheme
-        if invoice_data['buyer'].get('id_number'):
-            party_id = etree.SubElement(party, f"{{{self.NSMAP['cac']}}}PartyIdentification")
-            id_elem = etree.SubElement(party_id, f"{{{self.NSMAP['cbc']}}}ID")
-            id_elem.text = invoice_data['buyer']['id_number']
-            id_elem.set("schemeID", invoice_data['buyer']['id_scheme'])
-        
+        if buyer.get('id_number'):
+            party_id = etree.SubElement(party, self._tag('cac', 'PartyIdentification'))
+            id_elem = etree.SubElement(party_id, self._tag('cbc', 'ID'))
+            id_elem.text = buyer['id_number']
+            id_elem.set("schemeID", buyer['id_scheme'])
+
         # Add postal address
-        postal_address = etree.SubElement(party, f"{{{self.NSMAP['cac']}}}PostalAddress")
-        etree.SubElement(postal_address, f"{{{self.NSMAP['cbc']}}}StreetName").text = invoice_data['buyer']['address']['street']
-        etree.SubElement(postal_address, f"{{{self.NSMAP['cbc']}}}BuildingNumber").text = invoice_data['buyer']['address']['building']
-        etree.SubElement(postal_address, f"{{{self.NSMAP['cbc']}}}CityName").text = invoice_data['buyer']['address']['city']
-        etree.SubElement(postal_address, f"{{{self.NSMAP['cbc']}}}PostalZone").text = invoice_data['buyer']['address']['postal_code']
-        etree.SubElement(postal_address, f"{{{self.NSMAP['cbc']}}}CountrySubentity").text = invoice_data['buyer']['address']['district']
-        country = etree.SubElement(postal_address, f"{{{self.NSMAP['cac']}}}Country")
-        etree.SubElement(country, f"{{{self.NSMAP['cbc']}}}IdentificationCode").text = invoice_data['buyer']['address']['country_code']
-        
+        postal_address = etree.SubElement(party, self._tag('cac', 'PostalAddress'))
+        etree.SubElement(postal_address, self._tag('cbc', 'StreetName')).text = buyer['address']['street']
+        etree.SubElement(postal_address, self._tag('cbc', 'BuildingNumber')).text = buyer['address']['building']
+        etree.SubElement(postal_address, self._tag('cbc', 'CityName')).text = buyer['address']['city']
+        etree.SubElement(postal_address, self._tag('cbc', 'PostalZone')).text = buyer['address']['postal_code']
+        etree.SubElement(postal_address, self._tag('cbc', 'CountrySubentity')).text = buyer['address']['district']
+        country = etree.SubElement(postal_address, self._tag('cac', 'Country'))
+        etree.SubElement(country, self._tag('cbc', 'IdentificationCode')).text = buyer['address']['country_code']
+
         # Add buyer name
-        party_legal_entity = etree.SubElement(party, f"{{{self.NSMAP['cac']}}}PartyLegalEntity")
-        etree.SubElement(party_legal_entity, f"{{{self.NSMAP['cbc']}}}RegistrationName").text = invoice_data['buyer']['name']
+        party_legal_entity = etree.SubElement(party, self._tag('cac', 'PartyLegalEntity'))
+        etree.SubElement(party_legal_entity, self._tag('cbc', 'RegistrationName')).text = buyer['name']
+        return accounting_customer_party
+
+    def _iter_line_items(self, invoice_data):
+        """Yield one InvoiceLine element per item, built standalone
+
+        Generating lines one at a time lets callers either attach them to
+        a tree or stream them straight to an output file without holding
+        every line in memory at once.
+        """
+        # Reuse the amounts vectorized in create_simple_invoice; recompute
+        # only if the invoice data was assembled by hand
+        line_totals = invoice_data.get('_line_totals')
+        line_vat = invoice_data.get('_line_vat')
+        if line_totals is None:
+            line_totals = [float(it['price']) * float(it['quantity'])
+                           for it in invoice_data['items']]
+            line_vat = [total * (invoice_data['tax_rate'] / 100)
+                        for total in line_totals]
 
-    def _add_line_items(self, invoice_root, invoice_data):
-        """Add line items to the invoice"""
-        tax_exclusive_total = 0
-        
         for i, item in enumerate(invoice_data['items']):
-            invoice_line = etree.SubElement(invoice_root, f"{{{self.NSMAP['cac']}}}InvoiceLine")
-            
+            invoice_line = etree.Element(self._tag('cac', 'InvoiceLine'))
+
+            # Pre-converted floats from create_simple_invoice; fall back to
+            # casting here for hand-built invoice dicts
+            price = item['_price_f'] if '_price_f' in item else float(item['price'])
+            quantity = item['_qty_f'] if '_qty_f' in item else float(item['quantity'])
+            price_str = self._format_amount(price)
+
             # Line ID
-            etree.SubElement(invoice_line, f"{{{self.NSMAP['cbc']}}}ID").text = str(item['id'])
+            etree.SubElement(invoice_line, self._tag('cbc', 'ID')).text = str(item['id'])
             
             # Quantity
-            invoiced_quantity = etree.SubElement(invoice_line, f"{{{self.NSMAP['cbc']}}}InvoicedQuantity")
-            invoiced_quantity.text = self._format_amount(item['quantity'])
+            invoiced_quantity = etree.SubElement(invoice_line, self._tag('cbc', 'InvoicedQuantity'))
+            invoiced_quantity.text = self._format_amount(quantity)
             invoiced_quantity.set("unitCode", item.get('unit_code', 'PCE'))
             
-            # Calculate line amount
-            line_total = float(item['price']) * float(item['quantity'])
-            tax_exclusive_total += line_total
-            
+            # Precomputed line amount
+            line_total = float(line_totals[i])
+
             # Line amount
-            line_extension_amount = etree.SubElement(invoice_line, f"{{{self.NSMAP['cbc']}}}LineExtensionAmount")
+            line_extension_amount = etree.SubElement(invoice_line, self._tag('cbc', 'LineExtensionAmount'))
             line_extension_amount.set("currencyID", "SAR")
             line_extension_amount.text = self._format_amount(line_total)
             
             # Tax total for the line
-            tax_amount = line_total * 0.15  # 15% VAT
-            tax_total = etree.SubElement(invoice_line, f"{{{self.NSMAP['cac']}}}TaxTotal")
+            tax_amount = float(line_vat[i])
+            tax_total = etree.SubElement(invoice_line, self._tag('cac', 'TaxTotal'))
             
-            tax_amount_elem = etree.SubElement(tax_total, f"{{{self.NSMAP['cbc']}}}TaxAmount")
+            tax_amount_elem = etree.SubElement(tax_total, self._tag('cbc', 'TaxAmount'))
             tax_amount_elem.set("currencyID", "SAR")
             tax_amount_elem.text = self._format_amount(tax_amount)
             
             # Add rounding amount (VAT-inclusive price)
-            rounding_amount = etree.SubElement(tax_total, f"{{{self.NSMAP['cbc']}}}RoundingAmount")
+            rounding_amount = etree.SubElement(tax_total, self._tag('cbc', 'RoundingAmount'))
             rounding_amount.set("currencyID", "SAR")
             rounding_amount.text = self._format_amount(line_total + tax_amount)
             
             # Add item information
-            item_elem = etree.SubElement(invoice_line, f"{{{self.NSMAP['cac']}}}Item")
-            etree.SubElement(item_elem, f"{{{self.NSMAP['cbc']}}}Name").text = item.get('name', f"Item {i+1}")
+            item_elem = etree.SubElement(invoice_line, self._tag('cac', 'Item'))
+            etree.SubElement(item_elem, self._tag('cbc', 'Name')).text = item.get('name', f"Item {i+1}")
             
             # Add tax category for the item - required by BR-CO-04
-            classified_tax_category = etree.SubElement(item_elem, f"{{{self.NSMAP['cac']}}}ClassifiedTaxCategory")
-            etree.SubElement(classified_tax_category, f"{{{self.NSMAP['cbc']}}}ID").text = "S"
-            etree.SubElement(classified_tax_category, f"{{{self.NSMAP['cbc']}}}Percent").text = "15"
-            tax_scheme = etree.SubElement(classified_tax_category, f"{{{self.NSMAP['cac']}}}TaxScheme")
-            etree.SubElement(tax_scheme, f"{{{self.NSMAP['cbc']}}}ID").text = "VAT"
+            classified_tax_category = etree.SubElement(item_elem, self._tag('cac', 'ClassifiedTaxCategory'))
+            etree.SubElement(classified_tax_category, self._tag('cbc', 'ID')).text = "S"
+            etree.SubElement(classified_tax_category, self._tag('cbc', 'Percent')).text = "15"
+            tax_scheme = etree.SubElement(classified_tax_category, self._tag('cac', 'TaxScheme'))
+            etree.SubElement(tax_scheme, self._tag('cbc', 'ID')).text = "VAT"
             
             # Price information
-            price = etree.SubElement(invoice_line, f"{{{self.NSMAP['cac']}}}Price")
-            price_amount = etree.SubElement(price, f"{{{self.NSMAP['cbc']}}}PriceAmount")
+            price = etree.SubElement(invoice_line, self._tag('cac', 'Price'))
+            price_amount = etree.SubElement(price, self._tag('cbc', 'PriceAmount'))
             price_amount.set("currencyID", "SAR")
-            price_amount.text = self._format_amount(item['price'])
+            price_amount.text = price_str
             
             # Add allowance charge information to price
-            allowance_charge = etree.SubElement(price, f"{{{self.NSMAP['cac']}}}AllowanceCharge")
-            etree.SubElement(allowance_charge, f"{{{self.NSMAP['cbc']}}}ChargeIndicator").text = "false"
-            etree.SubElement(allowance_charge, f"{{{self.NSMAP['cbc']}}}AllowanceChargeReason").text = "Discount"
-            amount = etree.SubElement(allowance_charge, f"{{{self.NSMAP['cbc']}}}Amount")
+            allowance_charge = etree.SubElement(price, self._tag('cac', 'AllowanceCharge'))
+            etree.SubElement(allowance_charge, self._tag('cbc', 'ChargeIndicator')).text = "false"
+            etree.SubElement(allowance_charge, self._tag('cbc', 'AllowanceChargeReason')).text = "Discount"
+            amount = etree.SubElement(allowance_charge, self._tag('cbc', 'Amount'))
             amount.set("currencyID", "SAR")
-            amount.text = "0.00"
-            base_amount = etree.SubElement(allowance_charge, f"{{{self.NSMAP['cbc']}}}BaseAmount")
+            amount.text = _ZERO
+            base_amount = etree.SubElement(allowance_charge, self._tag('cbc', 'BaseAmount'))
             base_amount.set("currencyID", "SAR")
-            base_amount.text = self._format_amount(item['price'])
-    
+            base_amount.text = price_str
+
+            yield invoice_line
+
     def _add_vat_breakdown(self, invoice_root, invoice_data):
         """Add VAT breakdown section"""
+        currency = invoice_data['currency']
+
         # Add Tax Total in document currency
-        tax_total = etree.SubElement(invoice_root, f"{{{self.NSMAP['cac']}}}TaxTotal")
+        tax_total = etree.SubElement(invoice_root, self._tag('cac', 'TaxTotal'))
         
         # Total tax amount
-        total_tax_amount = etree.SubElement(tax_total, f"{{{self.NSMAP['cbc']}}}TaxAmount")
-        total_tax_amount.set("currencyID", invoice_data.get('currency', "SAR"))
+        total_tax_amount = etree.SubElement(tax_total, self._tag('cbc', 'TaxAmount'))
+        total_tax_amount.set("currencyID", currency)
         total_tax_amount.text = self._format_amount(invoice_data['vat_amount'])
         
         # Add tax subtotal
-        tax_subtotal = etree.SubElement(tax_total, f"{{{self.NSMAP['cac']}}}TaxSubtotal")
+        tax_subtotal = etree.SubElement(tax_total, self._tag('cac', 'TaxSubtotal'))
         
         # Taxable amount
-        taxable_amount = etree.SubElement(tax_subtotal, f"{{{self.NSMAP['cbc']}}}TaxableAmount")
-        taxable_amount.set("currencyID", invoice_data.get('currency', "SAR"))
+        taxable_amount = etree.SubElement(tax_subtotal, self._tag('cbc', 'TaxableAmount'))
+        taxable_amount.set("currencyID", currency)
         taxable_amount.text = self._format_amount(invoice_data['total_without_vat'])
         
         # Tax amount
-        tax_amount = etree.SubElement(tax_subtotal, f"{{{self.NSMAP['cbc']}}}TaxAmount")
-        tax_amount.set("currencyID", invoice_data.get('currency', "SAR"))
+        tax_amount = etree.SubElement(tax_subtotal, self._tag('cbc', 'TaxAmount'))
+        tax_amount.set("currencyID", currency)
         tax_amount.text = self._format_amount(invoice_data['vat_amount'])
         
         # Tax category
-        tax_category = etree.SubElement(tax_subtotal, f"{{{self.NSMAP['cac']}}}TaxCategory")
-        etree.SubElement(tax_category, f"{{{self.NSMAP['cbc']}}}ID").text = "S"
-        etree.SubElement(tax_category, f"{{{self.NSMAP['cbc']}}}Percent").text = str(invoice_data['tax_rate'])
-        tax_scheme = etree.SubElement(tax_category, f"{{{self.NSMAP['cac']}}}TaxScheme")
-        etree.SubElement(tax_scheme, f"{{{self.NSMAP['cbc']}}}ID").text = "VAT"
+        tax_category = etree.SubElement(tax_subtotal, self._tag('cac', 'TaxCategory'))
+        etree.SubElement(tax_category, self._tag('cbc', 'ID')).text = "S"
+        etree.SubElement(tax_category, self._tag('cbc', 'Percent')).text = str(invoice_data['tax_rate'])
+        tax_scheme = etree.SubElement(tax_category, self._tag('cac', 'TaxScheme'))
+        etree.SubElement(tax_scheme, self._tag('cbc', 'ID')).text = "VAT"
         
         # Add Tax Total for tax currency without subtotals (BR-KSA-EN16931-09)
-        tax_currency = invoice_data.get('tax_currency', invoice_data.get('currency', "SAR"))
-        tax_currency_total = etree.SubElement(invoice_root, f"{{{self.NSMAP['cac']}}}TaxTotal")
-        tax_currency_amount = etree.SubElement(tax_currency_total, f"{{{self.NSMAP['cbc']}}}TaxAmount")
+        tax_currency = invoice_data['tax_currency']
+        tax_currency_total = etree.SubElement(invoice_root, self._tag('cac', 'TaxTotal'))
+        tax_currency_amount = etree.SubElement(tax_currency_total, self._tag('cbc', 'TaxAmount'))
         tax_currency_amount.set("currencyID", tax_currency)
         tax_currency_amount.text = self._format_amount(invoice_data['vat_amount'])
 
     def _add_monetary_totals(self, invoice_root, invoice_data):
         """Add monetary totals section"""
-        legal_monetary_total = etree.SubElement(invoice_root, f"{{{self.NSMAP['cac']}}}LegalMonetaryTotal")
+        currency = invoice_data['currency']
+        legal_monetary_total = etree.SubElement(invoice_root, self._tag('cac', 'LegalMonetaryTotal'))
         
         # Line extension amount
-        line_extension = etree.SubElement(legal_monetary_total, f"{{{self.NSMAP['cbc']}}}LineExtensionAmount")
-        line_extension.set("currencyID", "SAR")
+        line_extension = etree.SubElement(legal_monetary_total, self._tag('cbc', 'LineExtensionAmount'))
+        line_extension.set("currencyID", currency)
         line_extension.text = self._format_amount(invoice_data['total_without_vat'])
         
         # Tax exclusive amount
-        tax_exclusive = etree.SubElement(legal_monetary_total, f"{{{self.NSMAP['cbc']}}}TaxExclusiveAmount")
-        tax_exclusive.set("currencyID", "SAR")
+        tax_exclusive = etree.SubElement(legal_monetary_total, self._tag('cbc', 'TaxExclusiveAmount'))
+        tax_exclusive.set("currencyID", currency)
         tax_exclusive.text = self._format_amount(invoice_data['total_without_vat'])
         
         # Tax inclusive amount
-        tax_inclusive = etree.SubElement(legal_monetary_total, f"{{{self.NSMAP['cbc']}}}TaxInclusiveAmount")
-        tax_inclusive.set("currencyID", "SAR")
+        tax_inclusive = etree.SubElement(legal_monetary_total, self._tag('cbc', 'TaxInclusiveAmount'))
+        tax_inclusive.set("currencyID", currency)
         tax_inclusive.text = self._format_amount(invoice_data['total_with_vat'])
         
         # Allowance total amount
-        allowance_total = etree.SubElement(legal_monetary_total, f"{{{self.NSMAP['cbc']}}}AllowanceTotalAmount")
-        allowance_total.set("currencyID", "SAR")
-        allowance_total.text = "0.00"
+        allowance_total = etree.SubElement(legal_monetary_total, self._tag('cbc', 'AllowanceTotalAmount'))
+        allowance_total.set("currencyID", currency)
+        allowance_total.text = _ZERO
         
         # Prepaid amount
-        prepaid = etree.SubElement(legal_monetary_total, f"{{{self.NSMAP['cbc']}}}PrepaidAmount")
-        prepaid.set("currencyID", "SAR") 
-        prepaid.text = "0.00"
+        prepaid = etree.SubElement(legal_monetary_total, self._tag('cbc', 'PrepaidAmount'))
+        prepaid.set("currencyID", currency) 
+        prepaid.text = _ZERO
         
         # Payable amount
-        payable = etree.SubElement(legal_monetary_total, f"{{{self.NSMAP['cbc']}}}PayableAmount")
-        payable.set("currencyID", "SAR")
+        payable = etree.SubElement(legal_monetary_total, self._tag('cbc', 'PayableAmount'))
+        payable.set("currencyID", currency)
         payable.text = self._format_amount(invoice_data['total_with_vat'])
 
-    def _add_signature_placeholder(self, invoice_root, signature=None):
-        """Add signature placeholder with valid base64 values"""
-        # Find or create UBLExtensions
-        extensions = invoice_root.find(f"{{{self.NSMAP['ext']}}}UBLExtensions")
+    def _add_signature_placeholder(self, invoice_root):
+        """Add the static signature scaffold with valid base64 values
+
+        Called once when the template is built; the per-invoice signature
+        is filled into ds:SignatureValue by create_invoice_xml.
+        """
+        # Find or create UBLExtensions. SubElement creates the node inside
+        # the invoice's own document; building it standalone and inserting
+        # would force lxml through its slow cross-document move path.
+        extensions = invoice_root.find(self._tag('ext', 'UBLExtensions'))
         if extensions is None:
-            extensions = etree.Element(f"{{{self.NSMAP['ext']}}}UBLExtensions")
-            invoice_root.insert(0, extensions)
+            extensions = etree.SubElement(invoice_root, self._tag('ext', 'UBLExtensions'))
+            if invoice_root[0] is not extensions:
+                # Reorder once so the extensions stay the first child
+                invoice_root[:] = [extensions] + [c for c in invoice_root
+                                                  if c is not extensions]
         
         # Create UBL extension for signature
-        extension = etree.SubElement(extensions, f"{{{self.NSMAP['ext']}}}UBLExtension")
-        etree.SubElement(extension, f"{{{self.NSMAP['ext']}}}ExtensionURI").text = "urn:oasis:names:specification:ubl:dsig:enveloped:xades"
-        extension_content = etree.SubElement(extension, f"{{{self.NSMAP['ext']}}}ExtensionContent")
+        extension = etree.SubElement(extensions, self._tag('ext', 'UBLExtension'))
+        etree.SubElement(extension, self._tag('ext', 'ExtensionURI')).text = "urn:oasis:names:specification:ubl:dsig:enveloped:xades"
+        extension_content = etree.SubElement(extension, self._tag('ext', 'ExtensionContent'))
         
         # Create signature structure
-        signatures = etree.SubElement(extension_content, f"{{{self.NSMAP['sig']}}}UBLDocumentSignatures")
-        signature_info = etree.SubElement(signatures, f"{{{self.NSMAP['sac']}}}SignatureInformation")
+        signatures = etree.SubElement(extension_content, self._tag('sig', 'UBLDocumentSignatures'))
+        signature_info = etree.SubElement(signatures, self._tag('sac', 'SignatureInformation'))
         
         # Add signature ID
-        etree.SubElement(signature_info, f"{{{self.NSMAP['cbc']}}}ID").text = "urn:oasis:names:specification:ubl:signature:1"
-        etree.SubElement(signature_info, f"{{{self.NSMAP['sbc']}}}ReferencedSignatureID").text = "urn:oasis:names:specification:ubl:signature:Invoice"
+        etree.SubElement(signature_info, self._tag('cbc', 'ID')).text = "urn:oasis:names:specification:ubl:signature:1"
+        etree.SubElement(signature_info, self._tag('sbc', 'ReferencedSignatureID')).text = "urn:oasis:names:specification:ubl:signature:Invoice"
         
         # Create XML DSig structure
-        sig_element = etree.SubElement(signature_info, f"{{{self.NSMAP['ds']}}}Signature", Id="signature")
-        signed_info = etree.SubElement(sig_element, f"{{{self.NSMAP['ds']}}}SignedInfo")
+        sig_element = etree.SubElement(signature_info, self._tag('ds', 'Signature'), Id="signature")
+        signed_info = etree.SubElement(sig_element, self._tag('ds', 'SignedInfo'))
         
         # Canonicalization and signature methods
-        etree.SubElement(signed_info, f"{{{self.NSMAP['ds']}}}CanonicalizationMethod", Algorithm="http://www.w3.org/2006/12/xml-c14n11")
-        etree.SubElement(signed_info, f"{{{self.NSMAP['ds']}}}SignatureMethod", Algorithm="http://www.w3.org/2001/04/xmldsig-more#ecdsa-sha256")
+        etree.SubElement(signed_info, self._tag('ds', 'CanonicalizationMethod'), Algorithm="http://www.w3.org/2006/12/xml-c14n11")
+        etree.SubElement(signed_info, self._tag('ds', 'SignatureMethod'), Algorithm="http://www.w3.org/2001/04/xmldsig-more#ecdsa-sha256")
         
         # Reference
-        reference = etree.SubElement(signed_info, f"{{{self.NSMAP['ds']}}}Reference", URI="")
-        transforms = etree.SubElement(reference, f"{{{self.NSMAP['ds']}}}Transforms")
+        reference = etree.SubElement(signed_info, self._tag('ds', 'Reference'), URI="")
+        transforms = etree.SubElement(reference, self._tag('ds', 'Transforms'))
         
         # XPath transforms
-        transform1 = etree.SubElement(transforms, f"{{{self.NSMAP['ds']}}}Transform", Algorithm="http://www.w3.org/TR/1999/REC-xpath-19991116")
-        etree.SubElement(transform1, f"{{{self.NSMAP['ds']}}}XPath").text = "not(//ancestor-or-self::ext:UBLExtensions)"
+        transform1 = etree.SubElement(transforms, self._tag('ds', 'Transform'), Algorithm="http://www.w3.org/TR/1999/REC-xpath-19991116")
+        etree.SubElement(transform1, self._tag('ds', 'XPath')).text = "not(//ancestor-or-self::ext:UBLExtensions)"
         
-        transform2 = etree.SubElement(transforms, f"{{{self.NSMAP['ds']}}}Transform", Algorithm="http://www.w3.org/TR/1999/REC-xpath-19991116")
-        etree.SubElement(transform2, f"{{{self.NSMAP['ds']}}}XPath").text = "not(//ancestor-or-self::cac:Signature)"
+        transform2 = etree.SubElement(transforms, self._tag('ds', 'Transform'), Algorithm="http://www.w3.org/TR/1999/REC-xpath-19991116")
+        etree.SubElement(transform2, self._tag('ds', 'XPath')).text = "not(//ancestor-or-self::cac:Signature)"
         
-        transform3 = etree.SubElement(transforms, f"{{{self.NSMAP['ds']}}}Transform", Algorithm="http://www.w3.org/TR/1999/REC-xpath-19991116")
-        etree.SubElement(transform3, f"{{{self.NSMAP['ds']}}}XPath").text = "not(//ancestor-or-self::cac:AdditionalDocumentReference[cbc:ID='QR'])"
+        transform3 = etree.SubElement(transforms, self._tag('ds', 'Transform'), Algorithm="http://www.w3.org/TR/1999/REC-xpath-19991116")
+        etree.SubElement(transform3, self._tag('ds', 'XPath')).text = "not(//ancestor-or-self::cac:AdditionalDocumentReference[cbc:ID='QR'])"
         
-        etree.SubElement(transforms, f"{{{self.NSMAP['ds']}}}Transform", Algorithm="http://www.w3.org/2006/12/xml-c14n11")
+        etree.SubElement(transforms, self._tag('ds', 'Transform'), Algorithm="http://www.w3.org/2006/12/xml-c14n11")
         
         # Digest method and value
-        etree.SubElement(reference, f"{{{self.NSMAP['ds']}}}DigestMethod", Algorithm="http://www.w3.org/2001/04/xmlenc#sha256")
+        etree.SubElement(reference, self._tag('ds', 'DigestMethod'), Algorithm="http://www.w3.org/2001/04/xmlenc#sha256")
         
-        # Generate a real digest value (valid base64)
-        digest_value = base64.b64encode(hashlib.sha256(b"invoice_digest").digest()).decode('utf-8')
-        etree.SubElement(reference, f"{{{self.NSMAP['ds']}}}DigestValue").text = digest_value
+        # Digest value placeholder (valid base64)
+        etree.SubElement(reference, self._tag('ds', 'DigestValue')).text = _PLACEHOLDER_DIGEST
         
-        # Signature value
-        signature_value = signature if signature else base64.b64encode(b"signature_placeholder").decode('utf-8')
-        etree.SubElement(sig_element, f"{{{self.NSMAP['ds']}}}SignatureValue").text = signature_value
+        # Signature value (placeholder; replaced per invoice when signing)
+        etree.SubElement(sig_element, self._tag('ds', 'SignatureValue')).text = _PLACEHOLDER_SIGNATURE
         
         # Key info
-        key_info = etree.SubElement(sig_element, f"{{{self.NSMAP['ds']}}}KeyInfo")
-        x509_data = etree.SubElement(key_info, f"{{{self.NSMAP['ds']}}}X509Data")
+        key_info = etree.SubElement(sig_element, self._tag('ds', 'KeyInfo'))
+        x509_data = etree.SubElement(key_info, self._tag('ds', 'X509Data'))
         
-        # X509 Certificate - use a valid base64 certificate placeholder
-        certificate = base64.b64encode(b"certificate_placeholder").decode('utf-8')
-        etree.SubElement(x509_data, f"{{{self.NSMAP['ds']}}}X509Certificate").text = certificate
+        # X509 Certificate - valid base64 certificate placeholder
+        etree.SubElement(x509_data, self._tag('ds', 'X509Certificate')).text = _PLACEHOLDER_CERTIFICATE
 
     def _add_qr_code(self, invoice_root, qr_content):
         """Add QR code to invoice"""
-        additional_doc_ref = etree.SubElement(invoice_root, f"{{{self.NSMAP['cac']}}}AdditionalDocumentReference")
-        etree.SubElement(additional_doc_ref, f"{{{self.NSMAP['cbc']}}}ID").text = "QR"
-        attachment = etree.SubElement(additional_doc_ref, f"{{{self.NSMAP['cac']}}}Attachment")
-        embedded_doc = etree.SubElement(attachment, f"{{{self.NSMAP['cbc']}}}EmbeddedDocumentBinaryObject")
+        additional_doc_ref = etree.SubElement(invoice_root, self._tag('cac', 'AdditionalDocumentReference'))
+        etree.SubElement(additional_doc_ref, self._tag('cbc', 'ID')).text = "QR"
+        attachment = etree.SubElement(additional_doc_ref, self._tag('cac', 'Attachment'))
+        embedded_doc = etree.SubElement(attachment, self._tag('cbc', 'EmbeddedDocumentBinaryObject'))
         embedded_doc.set("mimeCode", "text/plain")
-        # Base64 encode the QR content to comply with schema requirements
-        embedded_doc.text = base64.b64encode(qr_content.encode('utf-8')).decode('utf-8')
+        # The QR payload is already base64 TLV; embed it as-is rather than
+        # base64-encoding it a second time
+        embedded_doc.text = qr_content
 
-    def create_invoice_xml(self, invoice_data, signature=None):
-        """Create full ZATCA-compliant XML invoice"""
-        # Create root element
-        root = etree.Element("Invoice", nsmap=self.NSMAP)
-        
-        # Add signature placeholder first (must be at the beginning)
-        self._add_signature_placeholder(root, signature)
-        
-        # Add common elements
-        self._add_common_elements(root, invoice_data)
+    def _build_invoice_tree(self, invoice_data, signature=None):
+        """Build the invoice tree up to (but excluding) the line items"""
+        # Resolve currencies once so the section builders read plain keys
+        # instead of repeating dict.get chains with defaults
+        currency = invoice_data.setdefault('currency', 'SAR')
+        invoice_data.setdefault('tax_currency', currency)
+
+        # Copy the static skeleton instead of rebuilding it element by
+        # element; only the dynamic parts are touched from here on
+        root = copy.deepcopy(self._template)
+
+        # Fill in the per-invoice signature value
+        if signature:
+            self._find_signature_value(root)[0].text = signature
+
+        # Fill dynamic header fields
+        self._fill_common_elements(root, invoice_data)
         
         # Generate QR code content
         qr_content = self.generate_qr_code(invoice_data, output_path=None)
@@ -489,32 +790,92 @@ class ZatcaInvoice:
         self._add_customer_info(root, invoice_data)
         
         # Add Delivery element (minimal required information)
-        delivery = etree.SubElement(root, f"{{{self.NSMAP['cac']}}}Delivery")
-        actual_delivery_date = etree.SubElement(delivery, f"{{{self.NSMAP['cbc']}}}ActualDeliveryDate")
+        delivery = etree.SubElement(root, self._tag('cac', 'Delivery'))
+        actual_delivery_date = etree.SubElement(delivery, self._tag('cbc', 'ActualDeliveryDate'))
         actual_delivery_date.text = invoice_data['issue_date']
         
         # Add Payment Means
-        payment_means = etree.SubElement(root, f"{{{self.NSMAP['cac']}}}PaymentMeans")
+        payment_means = etree.SubElement(root, self._tag('cac', 'PaymentMeans'))
         payment_means_code = invoice_data.get('payment_means_code', "10")  # Default: Cash payment
-        etree.SubElement(payment_means, f"{{{self.NSMAP['cbc']}}}PaymentMeansCode").text = payment_means_code
+        etree.SubElement(payment_means, self._tag('cbc', 'PaymentMeansCode')).text = payment_means_code
         
         # Add VAT breakdown before invoice lines
         self._add_vat_breakdown(root, invoice_data)
         
         # Add monetary totals before invoice lines
         self._add_monetary_totals(root, invoice_data)
-        
+
+        return root
+
+    def _fill_signed_digest(self, invoice_root):
+        """Replace the scaffold digest with the real canonical invoice hash
+
+        Mirrors the transforms declared in the signature reference: the
+        invoice minus UBLExtensions and the QR reference is canonicalized
+        with libxml2's C14N and SHA-256 hashed — the canonical bytes are
+        produced exactly once per invoice.
+        """
+        pruned = copy.deepcopy(invoice_root)
+        for node in self._find_excluded_from_digest(pruned):
+            pruned.remove(node)
+        canon = etree.tostring(pruned, method='c14n', exclusive=False,
+                               with_comments=False)
+        digest_value = _b64(_digest(canon))
+        self._find_digest_value(invoice_root)[0].text = digest_value
+        # Keep the latest hash around so callers can chain it into the next
+        # invoice's previous_invoice_hash (PIH) without re-hashing the XML
+        self.last_invoice_hash = digest_value
+        return digest_value
+
+    def create_invoice_xml(self, invoice_data, signature=None, pretty=False):
+        """Create full ZATCA-compliant XML invoice
+
+        Output is compact by default — the XML is machine-consumed, and
+        indentation only adds whitespace text nodes that slow down later
+        canonicalization. Pass pretty=True when debugging by eye.
+        """
+        root = self._build_invoice_tree(invoice_data, signature)
+
         # Add line items (must come after TaxTotal and LegalMonetaryTotal)
-        self._add_line_items(root, invoice_data)
-        
-        # Return XML without declaration (will be added separately)
-        return etree.tostring(root, pretty_print=True, encoding='unicode', xml_declaration=False)
+        root.extend(self._iter_line_items(invoice_data))
+
+        # Hash the canonicalized document into the signature reference
+        self._fill_signed_digest(root)
+
+        # Return UTF-8 bytes with the declaration emitted by lxml itself;
+        # decoding to str would force a full copy that downstream
+        # hashing/transmission would only re-encode
+        return etree.tostring(root, pretty_print=pretty, encoding='UTF-8', xml_declaration=True)
+
+    def write_invoice_xml(self, invoice_data, out, signature=None):
+        """Serialize the invoice incrementally to a binary file-like object
+
+        Unlike create_invoice_xml, this never materializes the serialized
+        document as one big string: sections are written to the stream as
+        they are visited. The full element tree still has to exist briefly
+        because the signature digest covers the canonicalized document.
+        """
+        root = self._build_invoice_tree(invoice_data, signature)
+        lines = list(self._iter_line_items(invoice_data))
+        root.extend(lines)
+        self._fill_signed_digest(root)
+        # Detach the lines again so they are streamed individually below
+        for line in lines:
+            root.remove(line)
+        with etree.xmlfile(out, encoding='utf-8') as xf:
+            xf.write_declaration()
+            with xf.element(root.tag, nsmap=self.NSMAP):
+                for child in root:
+                    xf.write(child)
+                for line in lines:
+                    xf.write(line)
 
     def generate_complete_invoice(self, seller_data, buyer_data, invoice_items, 
                                  invoice_number=None, previous_invoice_hash=None,
                                  issue_date=None, issue_time=None, tax_rate=15,
                                  payment_means_code="10", currency="SAR",
-                                 private_key_path="zatca_private.pem", output_path=None):
+                                 private_key_path="zatca_private.pem", output_path=None,
+                                 pretty=False, return_xml=True, icv=None):
         """Generate a complete ZATCA-compliant invoice with dynamic data
         
         Args:
@@ -530,61 +891,153 @@ class ZatcaInvoice:
             currency (str, optional): Currency code (default: "SAR")
             private_key_path (str, optional): Path to private key for signing
             output_path (str, optional): Path to save the invoice XML
-            
+            pretty (bool, optional): Indent the XML for debugging (default: False)
+            return_xml (bool, optional): Return the serialized XML. When
+                False and output_path is set, the invoice is streamed
+                straight to disk without ever building the document as one
+                bytes object, and the output path is returned instead.
+            icv (int, optional): Explicit invoice counter value; defaults
+                to this instance's own counter. Bulk mode assigns it from
+                the parent so worker-local counters never collide.
+
         Returns:
-            str: The complete XML invoice
+            bytes: The complete UTF-8 encoded XML invoice (or the output
+            path when return_xml is False)
+
+        Errors propagate to the caller with their traceback intact;
+        callers that want a nullable API can wrap this in their own
+        handler, as the CLI driver and bulk workers do.
         """
-        try:
-            # Check if private key exists, generate it if it doesn't
+        # Check if private key exists, generate it if it doesn't; once a
+        # path has been confirmed, skip the stat() on later invoices
+        if private_key_path not in self._ready_keys:
             if not os.path.exists(private_key_path):
                 self.generate_keys(private_key_path)
-            
-            # Create invoice data
-            invoice_data = self.create_simple_invoice(
-                seller_data=seller_data,
-                buyer_data=buyer_data,
-                invoice_items=invoice_items,
-                invoice_number=invoice_number,
-                previous_invoice_hash=previous_invoice_hash,
-                issue_date=issue_date,
-                issue_time=issue_time,
-                tax_rate=tax_rate
-            )
-            
-            # Add additional fields
-            invoice_data['payment_means_code'] = payment_means_code
-            invoice_data['currency'] = currency
-            
-            # Sign the invoice
-            signature = self.sign_invoice(invoice_data, private_key_path)
-            
-            # Create XML without declaration
-            invoice_xml = self.create_invoice_xml(invoice_data, signature)
-            
-            # Add XML declaration separately
-            final_invoice = f'<?xml version="1.0" encoding="UTF-8"?>\n{invoice_xml}'
-            
-            # Save to file if output path provided
-            if output_path:
-                with open(output_path, "w", encoding="utf-8") as f:
-                    f.write(final_invoice)
-                print(f"Invoice successfully generated and saved to: {output_path}")
-            
-            return final_invoice
-            
-        except Exception as e:
-            print(f"Error generating invoice: {str(e)}")
-            return None
+            self._ready_keys.add(private_key_path)
+
+        # Create invoice data
+        invoice_data = self.create_simple_invoice(
+            seller_data=seller_data,
+            buyer_data=buyer_data,
+            invoice_items=invoice_items,
+            invoice_number=invoice_number,
+            previous_invoice_hash=previous_invoice_hash,
+            issue_date=issue_date,
+            issue_time=issue_time,
+            tax_rate=tax_rate
+        )
+
+        # Add additional fields
+        invoice_data['payment_means_code'] = payment_means_code
+        invoice_data['currency'] = currency
+        if icv is not None:
+            invoice_data['icv'] = icv
+
+        # Sign the invoice
+        signature = self.sign_invoice(invoice_data, private_key_path)
+
+        # File-only callers get the streaming serializer, which never
+        # holds the whole document in memory
+        if output_path and not return_xml:
+            with open(output_path, "wb") as f:
+                self.write_invoice_xml(invoice_data, f, signature)
+            log.debug("Invoice generated and saved to %s", output_path)
+            return output_path
+
+        # Create XML; lxml emits the declaration as part of serialization
+        final_invoice = self.create_invoice_xml(invoice_data, signature, pretty=pretty)
+
+        # Save to file if output path provided; the serializer already
+        # produced UTF-8 bytes, so this is one open + one write with no
+        # re-encode in between
+        if output_path:
+            Path(output_path).write_bytes(final_invoice)
+            log.debug("Invoice generated and saved to %s", output_path)
+
+        return final_invoice
+
+    def generate_invoices_bulk(self, invoices, workers=None,
+                               private_key_path="zatca_private.pem"):
+        """Generate many invoices in parallel across worker processes
+
+        Signing is the compute-bound step and the XML/QR work per invoice
+        is independent, so batches scale close to linearly with cores.
+        Each worker builds its own ZatcaInvoice once, amortizing the
+        template and parsed-key caches over its share of the batch.
+
+        Args:
+            invoices (list): One dict of generate_complete_invoice keyword
+                arguments per invoice. Entries without an invoice_number
+                (or icv) get unique values assigned from this instance's
+                counter before fan-out.
+            workers (int, optional): Process count (default: CPU count)
+            private_key_path (str, optional): Signing key shared by the batch
+
+        Returns:
+            list: The generated XML (bytes) per invoice, in input order
+        """
+        # Create the key up front so workers never race to generate it
+        if not os.path.exists(private_key_path):
+            self.generate_keys(private_key_path)
+
+        # Every worker counter starts at 1, so letting workers default
+        # invoice numbers or ICVs would duplicate legal identifiers across
+        # processes; assign both here from the parent's counter instead
+        stamp = datetime.now().strftime(_COMPACT_DATE_FMT)
+        prepared = []
+        for invoice_kwargs in invoices:
+            invoice_kwargs = dict(invoice_kwargs)
+            if not invoice_kwargs.get('invoice_number'):
+                invoice_kwargs['invoice_number'] = f"INV-{stamp}-{self.invoice_counter:03d}"
+            invoice_kwargs.setdefault('icv', self.invoice_counter)
+            # Forward the batch key so workers sign with it instead of
+            # falling back to (and auto-generating) the default path
+            invoice_kwargs.setdefault('private_key_path', private_key_path)
+            self.invoice_counter += 1
+            prepared.append(invoice_kwargs)
+
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                                 initializer=_bulk_worker_init) as executor:
+            return list(executor.map(_bulk_worker_generate, prepared))
+
+
+# Per-process worker state for generate_invoices_bulk; initialized once per
+# worker so the template, tag and key caches are shared within the process
+_worker_invoice = None
+
+
+def _bulk_worker_init():
+    global _worker_invoice
+    _worker_invoice = ZatcaInvoice()
+
+
+def _bulk_worker_generate(invoice_kwargs):
+    # One bad invoice must not abort the whole batch, so the error
+    # boundary for bulk mode sits here at the process edge
+    try:
+        return _worker_invoice.generate_complete_invoice(**invoice_kwargs)
+    except Exception as e:
+        log.error("Error generating invoice: %s", e)
+        return None
 
 
 # Example usage
 if __name__ == "__main__":
     import argparse
-    import json
-    
+
+    # orjson parses large batch configs several times faster than the
+    # stdlib json module; fall back transparently when it isn't installed
+    try:
+        import orjson
+        _loads = orjson.loads
+    except ImportError:
+        _loads = json.loads
+
+
     parser = argparse.ArgumentParser(description='Generate ZATCA E-Invoice')
     parser.add_argument('--config', type=str, help='Path to JSON config file with invoice details')
     parser.add_argument('--output', type=str, help='Output file path')
+    parser.add_argument('--pretty', action='store_true', help='Indent the XML output (debugging)')
     args = parser.parse_args()
     
     # Create ZATCA invoice processor
@@ -595,13 +1048,16 @@ if __name__ == "__main__":
     os.makedirs(output_dir, exist_ok=True)
     output_file = args.output or os.path.join(output_dir, "zatca_invoice.xml")
     
-    if args.config:
-        # Load invoice data from JSON config file
-        with open(args.config, 'r') as f:
-            config = json.load(f)
-        
-        # Generate invoice from config
-        invoice_xml = zatca.generate_complete_invoice(
+    def generate_or_exit(**kwargs):
+        # CLI error boundary: the library lets failures propagate, so the
+        # driver turns them into a message and a nonzero exit
+        try:
+            return zatca.generate_complete_invoice(**kwargs)
+        except Exception as e:
+            raise SystemExit(f"Failed to generate invoice: {e}")
+
+    def config_to_kwargs(config, output_path):
+        return dict(
             seller_data=config['seller'],
             buyer_data=config['buyer'],
             invoice_items=config['items'],
@@ -612,8 +1068,41 @@ if __name__ == "__main__":
             tax_rate=config.get('tax_rate', 15),
             payment_means_code=config.get('payment_means_code', "10"),
             currency=config.get('currency', "SAR"),
-            output_path=output_file
+            output_path=output_path,
+            pretty=args.pretty
         )
+
+    if args.config:
+        # Load invoice data from JSON config file; reading bytes lets
+        # orjson parse without an intermediate str decode
+        with open(args.config, 'rb') as f:
+            config = _loads(f.read())
+
+        if isinstance(config, list):
+            # Batch config: one invoice per entry, fanned out across
+            # worker processes; signing is CPU-bound so this scales with
+            # cores. Each invoice lands in its own numbered file, and
+            # entries without an explicit invoice_number get one derived
+            # from the same batch index so numbers are unique and match
+            # their file names (worker-local counters would collide).
+            base, ext = os.path.splitext(output_file)
+            stamp = datetime.now().strftime(_COMPACT_DATE_FMT)
+            batch = []
+            for i, entry in enumerate(config, 1):
+                kwargs = config_to_kwargs(entry, f"{base}_{i:04d}{ext}")
+                if not kwargs.get('invoice_number'):
+                    kwargs['invoice_number'] = f"INV-{stamp}-{i:04d}"
+                kwargs['icv'] = i
+                batch.append(kwargs)
+            results = zatca.generate_invoices_bulk(batch)
+            failed = results.count(None)
+            print(f"Batch complete: {len(results) - failed} of {len(results)} invoices generated")
+            if failed:
+                print(f"{failed} invoice(s) failed; see log output for details.")
+            raise SystemExit(1 if failed else 0)
+
+        # Generate invoice from config
+        invoice_xml = generate_or_exit(**config_to_kwargs(config, output_file))
     else:
         # Example data for demonstration
         seller_data = {
@@ -656,15 +1145,13 @@ if __name__ == "__main__":
         ]
         
         # Generate invoice with example data
-        invoice_xml = zatca.generate_complete_invoice(
+        invoice_xml = generate_or_exit(
             seller_data=seller_data,
             buyer_data=buyer_data,
             invoice_items=invoice_items,
-            output_path=output_file
+            output_path=output_file,
+            pretty=args.pretty
         )
-    
-    if invoice_xml:
-        print("Invoice generation complete!")
-        print(f"Output file: {output_file}")
-    else:
-        print("Failed to generate invoice.")
+
+    print("Invoice generation complete!")
+    print(f"Output file: {output_file}")